@@ -4,14 +4,25 @@ from .arch_base import TileDevice
 from .cuda import CUDA
 from .cpu import CPU
 from .cdna import CDNA
-from typing import Union
+from typing import Dict, Optional, Tuple, Union
 from tvm.target import Target
 
+# Arch objects are shared across operators with the same target,
+# keyed by the string representation of the target and its host.
+_ARCH_CACHE: Dict[Tuple[str, Optional[str]], TileDevice] = {}
+
 
 def get_arch(target: Union[str, Target] = "cuda") -> TileDevice:
     if isinstance(target, str):
         target = Target(target)
 
+    target_key = (str(target), str(target.host) if target.host is not None else None)
+    if target_key not in _ARCH_CACHE:
+        _ARCH_CACHE[target_key] = _create_arch(target)
+    return _ARCH_CACHE[target_key]
+
+
+def _create_arch(target: Target) -> TileDevice:
     if target.kind.name == "cuda":
         return CUDA(target)
     elif target.kind.name == "llvm":
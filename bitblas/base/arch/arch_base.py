@@ -1,7 +1,28 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-from typing import List
+from typing import Callable, Dict, List, Tuple
+
+# Device attributes are queried from the runtime once per device, arch objects
+# constructed directly instead of through get_arch skip the queries as well.
+_DEVICE_ATTRS: Dict[Tuple[int, int], Dict] = {}
+
+
+def get_device_attrs(device_func: Callable, device_id: int = 0) -> Dict:
+    """Get the cached attributes of the device created by `device_func(device_id)`,
+    e.g. `tvm.runtime.cuda` or `tvm.runtime.rocm`."""
+    device = device_func(device_id)
+    key = (device.device_type, device_id)
+    if key not in _DEVICE_ATTRS:
+        if not device.exist:
+            raise RuntimeError(f"Cannot find device {device}.")
+        _DEVICE_ATTRS[key] = {
+            "max_shared_memory_per_block": device.max_shared_memory_per_block,
+            "multi_processor_count": device.multi_processor_count,
+            "warp_size": device.warp_size,
+            "compute_version": device.compute_version,
+        }
+    return _DEVICE_ATTRS[key]
 
 
 class TileDevice:
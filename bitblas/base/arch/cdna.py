@@ -3,33 +3,67 @@
 
 from bitblas import tvm
 from tvm.target import Target
-from .arch_base import TileDevice
-from typing import List, Union
+from .arch_base import TileDevice, get_device_attrs
+from .cuda import TensorInstruction
+from typing import Dict, List, Union
 
 
 def is_cdna_arch(arch: TileDevice) -> bool:
     return isinstance(arch, CDNA)
 
 
+# precisions with registered mfma intrinsics, see bitblas.gpu.intrin.hip
+cdna_tensorcore_supported = [
+    ("float16", "float32"),
+]
+
+# L2 cache size per device (MI300 per XCD) for targets that do not carry
+# the l2_cache_size_bytes attr, keyed by the gfx arch of the target mcpu.
+_CDNA_L2_CACHE_SIZE_BYTES: Dict[str, int] = {
+    "gfx908": 8 << 20,
+    "gfx90a": 8 << 20,
+    "gfx940": 4 << 20,
+    "gfx941": 4 << 20,
+    "gfx942": 4 << 20,
+}
+_DEFAULT_L2_CACHE_SIZE_BYTES = 4 << 20
+
+
+def get_cdna_l2_cache_size_bytes(target: Target) -> int:
+    l2_cache_size_bytes = int(target.attrs.get("l2_cache_size_bytes", 0))
+    if l2_cache_size_bytes > 0:
+        return l2_cache_size_bytes
+    mcpu = str(target.attrs.get("mcpu", "")).split(":")[0]
+    return _CDNA_L2_CACHE_SIZE_BYTES.get(mcpu, _DEFAULT_L2_CACHE_SIZE_BYTES)
+
+
 class CDNA(TileDevice):
 
     def __init__(self, target: Union[Target, str]):
         if isinstance(target, str):
             target = tvm.target.Target(target)
         self.target = target
-        device = tvm.runtime.rocm(0)
-        if not device.exist:
-            raise RuntimeError("Cannot find HIP device 0.")
-        self.device: tvm.runtime.Device = device
+        device_attrs = get_device_attrs(tvm.runtime.rocm, 0)
+        self.device: tvm.runtime.Device = tvm.runtime.rocm(0)
         self.platform: str = "CDNA"
-        self.smem_cap = device.max_shared_memory_per_block
-        self.compute_max_core = device.multi_processor_count
-        self.warp_size = device.warp_size
-        self.compute_capability = device.compute_version.replace(".", "")
+        self.smem_cap = device_attrs["max_shared_memory_per_block"]
+        self.compute_max_core = device_attrs["multi_processor_count"]
+        self.warp_size = device_attrs["warp_size"]
+        self.compute_capability = device_attrs["compute_version"].replace(".", "")
         self.reg_cap: int = 32768
         self.max_smem_usage: int = 2 * self.smem_cap
         self.sm_partition: int = 4
-        self.l2_cache_size_bytes: int = target.l2_cache_size_bytes
+        self.l2_cache_size_bytes: int = get_cdna_l2_cache_size_bytes(target)
         self.transaction_size: List[int] = [32, 128]  # in bytes
 
         self.bandwidth: List[int] = [1300, 14000]
+        # get the available tensor instructions during runtime to avoid
+        # the dependency of the tensor intrinsics registration
+        self.available_tensor_instructions: List[TensorInstruction] = None
+
+    def get_avaliable_tensorintrin_shapes(self):
+        self.available_tensor_instructions = (TensorInstruction("mfma", [16, 16]),)
+        return [t.shape for t in self.available_tensor_instructions]
+
+    def __repr__(self):
+        return f"CDNA({self.target})"
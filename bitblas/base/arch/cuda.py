@@ -3,7 +3,7 @@
 
 from bitblas import tvm
 from tvm.target import Target
-from .arch_base import TileDevice
+from .arch_base import TileDevice, get_device_attrs
 from typing import List, Union
 
 
@@ -17,39 +17,33 @@ def is_cuda_arch(arch: TileDevice) -> bool:
 
 
 def is_volta_arch(arch: TileDevice) -> bool:
-    conditions = [True]
-    conditions.append(is_cuda_arch(arch))
-    conditions.append(arch.sm_version >= 70)
-    conditions.append(arch.sm_version < 80)
-    return all(conditions)
+    if not is_cuda_arch(arch):
+        return False
+    return arch.sm_version >= 70 and arch.sm_version < 80
 
 
 def is_ampere_arch(arch: TileDevice) -> bool:
-    conditions = [True]
-    conditions.append(is_cuda_arch(arch))
-    conditions.append(arch.sm_version >= 80 and arch.sm_version < 89)
-    return all(conditions)
+    if not is_cuda_arch(arch):
+        return False
+    return arch.sm_version >= 80 and arch.sm_version < 89
 
 
 def is_ada_arch(arch: TileDevice) -> bool:
-    conditions = [True]
-    conditions.append(is_cuda_arch(arch))
-    conditions.append(arch.sm_version == 89)
-    return all(conditions)
+    if not is_cuda_arch(arch):
+        return False
+    return arch.sm_version == 89
 
 
 def is_hopper_arch(arch: TileDevice) -> bool:
-    conditions = [True]
-    conditions.append(is_cuda_arch(arch))
-    conditions.append(arch.sm_version == 90)
-    return all(conditions)
+    if not is_cuda_arch(arch):
+        return False
+    return arch.sm_version == 90
 
 
 def has_mma_support(arch: TileDevice) -> bool:
-    conditions = [True]
-    conditions.append(is_cuda_arch(arch))
-    conditions.append(arch.sm_version >= 80)
-    return all(conditions)
+    if not is_cuda_arch(arch):
+        return False
+    return arch.sm_version >= 80
 
 
 volta_tensorcore_supported = [
@@ -80,8 +74,11 @@ hopper_tensorcore_supported = ada_tensorcore_supported
 # instead of assuming both a and b share the same dtype.
 # As the tensorcore may supports e4m3_float8 * e5m2_float8
 def is_tensorcore_supported_precision(in_dtype: str, accum_dtype: str, arch: TileDevice) -> bool:
+    from .cdna import is_cdna_arch, cdna_tensorcore_supported  # pylint: disable=import-outside-toplevel
 
-    if is_volta_arch(arch):
+    if is_cdna_arch(arch):
+        return (in_dtype, accum_dtype) in cdna_tensorcore_supported
+    elif is_volta_arch(arch):
         return (in_dtype, accum_dtype) in volta_tensorcore_supported
     elif is_ampere_arch(arch):
         return (in_dtype, accum_dtype) in ampere_tensorcore_supported
@@ -112,15 +109,13 @@ class CUDA(TileDevice):
             target = tvm.target.Target(target)
         self.target = target
         self.sm_version = check_sm_version(self.target.arch)
-        device = tvm.runtime.cuda(0)
-        if not device.exist:
-            raise RuntimeError("Cannot find cuda device 0.")
-        self.device: tvm.runtime.Device = device
+        device_attrs = get_device_attrs(tvm.runtime.cuda, 0)
+        self.device: tvm.runtime.Device = tvm.runtime.cuda(0)
         self.platform: str = "CUDA"
-        self.smem_cap = device.max_shared_memory_per_block
-        self.compute_max_core = device.multi_processor_count
-        self.warp_size = device.warp_size
-        self.compute_capability = device.compute_version.replace(".", "")
+        self.smem_cap = device_attrs["max_shared_memory_per_block"]
+        self.compute_max_core = device_attrs["multi_processor_count"]
+        self.warp_size = device_attrs["warp_size"]
+        self.compute_capability = device_attrs["compute_version"].replace(".", "")
         self.reg_cap: int = 65536
         self.max_smem_usage: int = 2 * self.smem_cap
         self.sm_partition: int = 4
@@ -67,18 +67,17 @@ class DefaultPolicy:
             steps[i].extend(added)
             steps[i] = sorted(steps[i])
         visited_tiles = {}
+        tile_prios = {}
         queue = PriorityQueue()
 
-        def prio(td: TileDict):
-            return (td.traffic + 1) * td.num_wave
-
         def add_to_queue(tile):
             if tuple(tile) in visited_tiles:
                 return
             td = self.compute_tile_dict(tile, rstep_map)
             visited_tiles[tuple(tile)] = td
             if td.valid:
-                queue.put([prio(td), tile])
+                tile_prios[tuple(tile)] = self._tile_priority(td)
+                queue.put([tile_prios[tuple(tile)], tile])
 
         add_to_queue(init_tile)
         while not (queue.empty() or len(visited_tiles) > 2000):
@@ -90,10 +89,18 @@ class DefaultPolicy:
                     new_tile[i] = steps[i][dim_ids[i] + 1]
                     add_to_queue(new_tile)
 
-        visited_tiles = filter(lambda td: td.valid, visited_tiles.values())
-        sorted_tiles = sorted(visited_tiles, key=lambda td: prio(td))
+        # rank the (up to 2000) candidates by the priorities computed when queued
+        valid_tiles = [visited_tiles[tile] for tile in tile_prios]
+        order = np.argsort(np.array(list(tile_prios.values())), kind="stable")
+        sorted_tiles = [valid_tiles[i] for i in order]
         return sorted_tiles
 
+    def _tile_priority(self, td: TileDict) -> float:
+        # a grid smaller than the number of SMs leaves the rest idle,
+        # scale the cost by the fraction of SMs that get a block
+        sm_fill = min(td.grid_size / self.arch.compute_max_core, 1.0)
+        return (td.traffic + 1) * td.num_wave / sm_fill
+
     def get_base_tile(self):
         """
         Gets the minimum tile configuration that satisfies no redundancy in computation.
@@ -677,6 +684,16 @@ class DefaultPolicy:
                     break
         # Plan vectorize
         codegen_dict.vectorize = self._plan_vectorize(node, td, block_size)
+        if node.reduction_block is None and codegen_dict.vectorize:
+            # elementwise schedule vectorizes the innermost step loop, widen it to
+            # the planned vector length to issue 128-bit accesses per thread
+            vec = min(codegen_dict.vectorize.values())
+            while vec > 1 and (codegen_dict.block[-1] // codegen_dict.thread[-1]) % vec != 0:
+                vec //= 2
+            if vec > 1:
+                if not codegen_dict._step:
+                    codegen_dict._step = [1 for _ in range(ndim)]
+                codegen_dict._step[-1] = max(codegen_dict._step[-1], vec)
         codegen_dict.arch = self.arch
         codegen_dict.opt_shapes = self.prim_func_node.get_tag("opt_shapes")
         return codegen_dict
@@ -716,8 +733,18 @@ class DefaultPolicy:
             return dtype.bits * vec <= 128
 
         vectorize_sizes = [16, 8, 4, 2]
-        dtypes = node.get_reduce_inputs_dtype()
-        shapes = node.propagate_reduction_inputs(td.get_tile(node), td.get_rstep(node))
+        if node.reduction_block is None:
+            # elementwise node, plan on every input and output buffer of the tile
+            tile = td.get_tile(node)
+            dtypes = {buffer.name: node.get_buffer_dtype(buffer) for buffer in node.args}
+            shapes = {
+                buffer.name: shape
+                for buffer, shape in zip(node.input_buffers, node.propagate_inputs(tile))
+            }
+            shapes.update({buffer.name: tile for buffer in node.output_buffers})
+        else:
+            dtypes = node.get_reduce_inputs_dtype()
+            shapes = node.propagate_reduction_inputs(td.get_tile(node), td.get_rstep(node))
         vectorize_result = {}
         for tensor, shape in shapes.items():
             for v in vectorize_sizes:
@@ -31,11 +31,14 @@ class TensorCorePolicy(DefaultPolicy):
         self._legalize_info()
 
     def _legalize_info(self):
+        # cp.async is available on ampere and later devices
+        support_async_copy = (
+            self.arch.platform == "CUDA" and getattr(self.arch, "sm_version", -1) >= 80)
         pipleline_stage = self.prim_func_node.get_tag("pipeline_stage")
         if pipleline_stage:
             self.pipeline_stage = pipleline_stage
         else:
-            if self.arch.compute_capability == "sm_80":
+            if support_async_copy:
                 self.pipeline_stage = 2
             else:
                 self.pipeline_stage = 1
@@ -43,7 +46,7 @@ class TensorCorePolicy(DefaultPolicy):
         if use_async_copy:
             self.use_async_copy = use_async_copy
         else:
-            if self.arch.compute_capability == "sm_80":
+            if support_async_copy:
                 self.use_async_copy = True
             else:
                 self.use_async_copy = False
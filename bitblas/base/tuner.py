@@ -2,6 +2,7 @@
 # Licensed under the MIT License.
 
 from bitblas import tvm
+import os
 from typing import List, Optional, Dict, Literal, Callable, Union
 from tvm import tir, IRModule
 from tvm.tir import PrimFunc
@@ -15,10 +16,14 @@ from bitblas.base.base_scheduler import BaseScheduler
 from bitblas.base.utils import apply_and_build as tir_apply_and_build
 from bitblas.tl.tuner import apply_and_build as tl_apply_and_build
 from bitblas.utils import retrieve_func_from_module
+from bitblas.common import get_build_workers
 import logging
 
 logger = logging.getLogger(__name__)
 
+# number of configs built and profiled per round when tuning serially with patience
+TUNE_BATCH_SIZE = 3
+
 
 def fast_tune_tir(
     func: PrimFunc,
@@ -26,6 +31,8 @@ def fast_tune_tir(
     topk: int = 10,
     parallel_build: bool = True,
     data_distribution: Literal["uniform", "onefill"] = "uniform",
+    early_abort_ratio: Optional[float] = None,
+    patience: Optional[int] = None,
 ):
     # check the function is a primfunc
     if not isinstance(func, tir.PrimFunc):
@@ -80,14 +87,63 @@ def fast_tune_tir(
     if len(configs) == 0:
         raise ValueError("No valid config generated")
 
-    cpresults, best = tir_apply_and_build(
+    if patience is None:
+        return tir_apply_and_build(
+            func,
+            configs,
+            arch,
+            parallel_build=parallel_build,
+            data_distribution=data_distribution,
+            early_abort_ratio=early_abort_ratio,
+        )
+
+    # a batch fills the builder pool, serial builds keep small batches
+    batch_size = min(os.cpu_count(), get_build_workers()) if parallel_build else TUNE_BATCH_SIZE
+    return apply_and_build_with_patience(
         func,
         configs,
         arch,
+        patience=patience,
+        batch_size=batch_size,
         parallel_build=parallel_build,
         data_distribution=data_distribution,
+        early_abort_ratio=early_abort_ratio,
     )
 
+
+def apply_and_build_with_patience(
+    func: PrimFunc,
+    configs: List,
+    arch,
+    patience: int,
+    batch_size: int = TUNE_BATCH_SIZE,
+    apply_and_build: Callable = tir_apply_and_build,
+    **kwargs,
+):
+    """Build and profile the configs, which are ranked by the roller cost model, in
+    batches of `batch_size`, and stop once `patience` batches in a row did not improve
+    the best one. Batches before the first valid candidate are not counted, and each
+    batch early aborts its candidates against the best one so far."""
+    cpresults, best = [], None
+    num_stale_batches = 0
+    for start in range(0, len(configs), batch_size):
+        batch_cpresults, batch_best = apply_and_build(
+            func,
+            configs[start:start + batch_size],
+            arch,
+            baseline_latency=None if best is None else best.latency,
+            **kwargs)
+        cpresults.extend(batch_cpresults)
+        if batch_best is not None and (best is None or batch_best.latency < best.latency):
+            best = batch_best
+            num_stale_batches = 0
+        elif best is not None:
+            num_stale_batches += 1
+            if num_stale_batches >= patience:
+                logger.debug(f"Stop tuning after {start + batch_size} of {len(configs)} "
+                             "configs, the best one has not improved.")
+                break
+
     return cpresults, best
 
 
@@ -130,9 +186,12 @@ def fast_tune(
     topk: int = 10,
     parallel_build: bool = True,
     data_distribution: Literal["uniform", "onefill"] = "uniform",
+    early_abort_ratio: Optional[float] = None,
+    patience: Optional[int] = None,
 ):
     if isinstance(func_or_scheduler, tir.PrimFunc):
-        return fast_tune_tir(func_or_scheduler, target, topk, parallel_build, data_distribution)
+        return fast_tune_tir(func_or_scheduler, target, topk, parallel_build, data_distribution,
+                             early_abort_ratio, patience)
     elif isinstance(func_or_scheduler, BaseScheduler):
         return fast_tune_tilelang(func_or_scheduler, target, topk, parallel_build,
                                   data_distribution)
@@ -262,6 +321,8 @@ def fast_tune_with_dynamic_range_tir(
     global_symbol: Optional[str] = None,
     dynamic_range: Optional[Dict[str, List[int]]] = None,
     kernel_name_generator: Optional[Callable] = None,
+    early_abort_ratio: Optional[float] = None,
+    patience: Optional[int] = None,
 ) -> IRModule:
     if dynamic_range is None:
         dynamic_range = {}
@@ -305,7 +366,13 @@ def fast_tune_with_dynamic_range_tir(
     specilized_tuned_funcs: List[tir.PrimFunc] = []
     for item in specialize_items:
         func = func.with_attr("opt_shapes", item)
-        _, best = fast_tune(func, target, topk, parallel_build)
+        _, best = fast_tune(
+            func,
+            target,
+            topk,
+            parallel_build,
+            early_abort_ratio=early_abort_ratio,
+            patience=patience)
         if best is None:
             return None
         specialized_func = best.sch.mod["main"]
@@ -407,10 +474,13 @@ def fast_tune_with_dynamic_range(
     global_symbol: Optional[str] = None,
     dynamic_range: Optional[Dict[str, List[int]]] = None,
     kernel_name_generator: Optional[Callable] = None,
+    early_abort_ratio: Optional[float] = None,
+    patience: Optional[int] = None,
 ) -> IRModule:
     if isinstance(func_or_scheduler, tir.PrimFunc):
         return fast_tune_with_dynamic_range_tir(func_or_scheduler, target, topk, parallel_build,
-                                                global_symbol, dynamic_range, kernel_name_generator)
+                                                global_symbol, dynamic_range, kernel_name_generator,
+                                                early_abort_ratio, patience)
     elif isinstance(func_or_scheduler, BaseScheduler):
         return fast_tune_with_dynamic_range_tilelang(func_or_scheduler, target, topk,
                                                      parallel_build, global_symbol, dynamic_range,
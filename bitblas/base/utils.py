@@ -2,22 +2,23 @@
 # Licensed under the MIT License.
 
 from bitblas import tvm
+import atexit
 import os
 from tvm.contrib.popen_pool import PopenPoolExecutor, StatusKind
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
-from typing import List, Tuple, Optional, Union, Literal
+from typing import List, Tuple, Optional, Union, Literal, Dict
 from tvm import tir, IRModule
 from tvm.runtime import Module
 from tvm.tir import Schedule
 from tvm.relax.expr import Function
 import bitblas
 from .analysis import get_root_block, get_reduction_blocks
-from bitblas.base.arch import TileDevice
+from bitblas.base.arch import TileDevice, is_cdna_arch
 from bitblas.base.roller.policy import TensorCorePolicy, DefaultPolicy
 from bitblas.base.roller.hint import Hint
 from bitblas.gpu.matmul_analysis import get_tensorized_func_and_tags
-from bitblas.common import MAX_ERROR_MESSAGE_LENGTH
+from bitblas.common import MAX_ERROR_MESSAGE_LENGTH, get_build_workers
 import tempfile
 from bitblas.utils import (
     tensor_replace_dp4a,
@@ -27,6 +28,8 @@ from bitblas.utils import (
 )
 from bitblas.utils.tensor_adapter import (
     np_float2np_bf16,)
+from bitblas.utils.nvrtc import nvrtc_compile_scope
+from contextlib import nullcontext
 import logging
 
 logger = logging.getLogger(__name__)
@@ -47,6 +50,74 @@ def get_rasterization_code(pannel_width: int = 8) -> str:
     """
 
 
+def get_build_pass_config() -> Dict:
+    """PassContext config of the tir builds, shared by the tuning candidates and the
+    operator build so that the deployed kernel is compiled as it was measured."""
+    return {
+        "tir.use_async_copy": True,
+        "tir.disable_cse_tir": True,
+        # peel the partial tiles of constant extent loops, so that the main
+        # loop body is emitted without the bound check guards.
+        "tir.LoopPartition": {
+            "partition_const_loop": True
+        },
+    }
+
+
+def profile_with_cuda_graph(rt_mod: Module,
+                            device,
+                            args,
+                            repeat: int = 3,
+                            min_repeat_ms: float = 1.0,
+                            max_number: int = 100,
+                            early_abort_latency: Optional[float] = None) -> float:
+    """Measure the latency (ms) of the entry function by replaying launches captured in
+    one CUDA graph, which hides the per launch overhead of tiny kernels.
+
+    Like the argument of time_evaluator, `min_repeat_ms` bounds the launches per replay:
+    the graph holds as many launches (at most `max_number`) as fit in it. The first
+    replay is the early abort probe, so the probe and the measurement are comparable.
+    """
+    import torch  # pylint: disable=import-outside-toplevel
+
+    func = rt_mod[rt_mod.entry_name]
+    stream = torch.cuda.Stream(device=device.device_id)
+    start = torch.cuda.Event(enable_timing=True)
+    end = torch.cuda.Event(enable_timing=True)
+
+    def capture(number):
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph, stream=stream):
+            for _ in range(number):
+                func(*args)
+        return graph
+
+    def replay(graph, number):
+        start.record(stream)
+        graph.replay()
+        end.record(stream)
+        end.synchronize()
+        return start.elapsed_time(end) / number
+
+    # tvm launches the kernel on its current stream, point it to the capture stream
+    device.set_raw_stream(stream.cuda_stream)
+    try:
+        with torch.cuda.stream(stream):
+            # the first call loads the module lazily, keep it out of the capture
+            func(*args)
+            stream.synchronize()
+            estimate = replay(capture(1), 1)
+            number = int(min(max(min_repeat_ms / max(estimate, 1e-6), 1), max_number))
+            graph = capture(number)
+            latencies = [replay(graph, number)]
+            if early_abort_latency is not None and latencies[0] > early_abort_latency:
+                return latencies[0]
+            latencies += [replay(graph, number) for _ in range(repeat - 1)]
+    finally:
+        device.set_raw_stream(0)
+    return float(np.mean(latencies))
+
+
 class CompileResult:
     """
     Class to store the result of compilation
@@ -60,10 +131,23 @@ class CompileResult:
         self.latency = 1e9
         self.time_evaluator = None
 
-    def profile(self, data_distribution="uniform"):
+    def profile(self, data_distribution="uniform", early_abort_latency: Optional[float] = None):
         func = retrieve_func_from_module(self.sch.mod)
         device = self.config.arch.device
         profile_tensors = get_dummy_input_arrays(func, device, distribution=data_distribution)
+        if self.config.arch.platform == "CUDA":
+            try:
+                return profile_with_cuda_graph(
+                    self.mod, device, profile_tensors, early_abort_latency=early_abort_latency)
+            except Exception as graph_error:  # noqa: F841
+                logger.debug(f"Profile with cuda graph failed, fallback: {graph_error}")
+        if early_abort_latency is not None:
+            # a single run is enough to tell a clearly slower candidate,
+            # skip the full measurement for it.
+            probe = self.mod.time_evaluator(self.mod.entry_name, device, number=1)
+            latency = probe(*profile_tensors).mean * 1e3
+            if latency > early_abort_latency:
+                return latency
         latency = self.time_evaluator(*profile_tensors).mean * 1e3
         return latency
 
@@ -130,7 +214,10 @@ def _apply_config(
     if not reduction_blocks:
         return bitblas.gpu.ElementWise().apply_config(func, config)
     elif config.use_tc:
-        if config.arch.sm_version >= 80:
+        if is_cdna_arch(config.arch):
+            # For AMD CDNA gpu, use MFMA matrix core tensorization.
+            return bitblas.gpu.MatmulTensorizationMFMA().apply_config(func, config)
+        elif config.arch.sm_version >= 80:
             # For A100(sm_80) or more advanced gpu, use MMA tensorization.
             return bitblas.gpu.MatmulTensorizationMMA().apply_config(func, config)
         else:
@@ -217,16 +304,55 @@ def get_dummy_input_arrays(
     return profile_tensors
 
 
+# Builder pools are kept alive across apply_and_build calls, keyed by
+# (target, max_workers, timeout), so the tuning loop only pays the worker
+# spawn and tvm/bitblas import cost once per process.
+_BUILDER_POOLS: Dict[Tuple[str, int, int], PopenPoolExecutor] = {}
+
+
+def _builder_worker_init(target: str):
+    # pre-import bitblas and resolve the target in the worker process
+    import bitblas  # noqa: F401  # pylint: disable=import-outside-toplevel
+    bitblas.tvm.target.Target(target)
+
+
+def get_builder_pool(arch: TileDevice, max_workers: int, timeout: int) -> PopenPoolExecutor:
+    target = str(arch.target)
+    key = (target, max_workers, timeout)
+    if key not in _BUILDER_POOLS:
+        _BUILDER_POOLS[key] = PopenPoolExecutor(
+            max_workers=max_workers,
+            timeout=timeout,
+            initializer=_builder_worker_init,
+            initargs=(target,),
+        )
+    return _BUILDER_POOLS[key]
+
+
+def shutdown_builder_pools():
+    """Release the worker processes of the shared builder pools, a later
+    apply_and_build call spawns new ones."""
+    # PopenPoolExecutor kills its workers once the last reference is dropped
+    _BUILDER_POOLS.clear()
+
+
+atexit.register(shutdown_builder_pools)
+
+
 def apply_and_build_parallel(func,
                              configs,
                              arch,
                              num_repeats=3,
                              max_workers=10,
                              timeout=60,
-                             data_distribution="uniform") -> CompileResult:
+                             data_distribution="uniform",
+                             early_abort_ratio: Optional[float] = None,
+                             baseline_latency: Optional[float] = None) -> CompileResult:
     cpresults = []
 
-    max_workers = min(len(configs), os.cpu_count(), max_workers)
+    # the builder pool is shared across calls, so it is not sized by len(configs)
+    pool_size = min(os.cpu_count(), max_workers)
+    max_workers = min(len(configs), pool_size)
 
     # apply config in thread parallel
     _sched: List[Schedule] = []
@@ -244,7 +370,7 @@ def apply_and_build_parallel(func,
         for future in as_completed(futures, timeout=timeout):
             _sched.append(future.result())
 
-    builder = PopenPoolExecutor(max_workers=max_workers, timeout=timeout)
+    builder = get_builder_pool(arch, pool_size, timeout)
 
     # build in process parallel
     def _build(context) -> str:
@@ -262,9 +388,13 @@ def apply_and_build_parallel(func,
             code = tensor_remove_make_int2(code)
             return code
 
-        with tvm.transform.PassContext(config={
-                "tir.use_async_copy": True,
-                "tir.disable_cse_tir": True,
+        # the builder workers inherit TVM_CUDA_COMPILE_MODE from the parent process
+        compile_scope = (
+            nvrtc_compile_scope(arch.compute_capability)
+            if arch.platform == "CUDA" else nullcontext())
+
+        with compile_scope, tvm.transform.PassContext(config={
+                **get_build_pass_config(),
                 **config.pass_context
         }):
             rt_mod = tvm.build(mod, target=arch.target)
@@ -310,14 +440,19 @@ def apply_and_build_parallel(func,
         else:
             raise ValueError(f"Unreachable: unexpected result: {map_result}")
 
-    del builder
-
     best = None
     best_latency = 1e9
     for cpresult in cpresults:
         config = cpresult.config
+        # baseline_latency is the best one of the configs tuned by previous calls
+        reference_latency = best_latency if baseline_latency is None else min(
+            best_latency, baseline_latency)
+        early_abort_latency = None
+        if early_abort_ratio is not None and reference_latency < 1e9:
+            early_abort_latency = reference_latency * early_abort_ratio
         try:
-            latency = cpresult.profile(data_distribution=data_distribution)
+            latency = cpresult.profile(
+                data_distribution=data_distribution, early_abort_latency=early_abort_latency)
         except Exception as e_mesg:
             logger.debug(f"Evaluation with config failed {e_mesg}")
             continue
@@ -338,7 +473,15 @@ def apply_and_build(
     arch,
     parallel_build=False,
     data_distribution="uniform",
+    early_abort_ratio: Optional[float] = None,
+    baseline_latency: Optional[float] = None,
 ) -> Tuple[List[CompileResult], CompileResult]:
-    max_workers = 10 if parallel_build else 1
+    max_workers = get_build_workers() if parallel_build else 1
     return apply_and_build_parallel(
-        func, configs, arch, max_workers=max_workers, data_distribution=data_distribution)
+        func,
+        configs,
+        arch,
+        max_workers=max_workers,
+        data_distribution=data_distribution,
+        early_abort_ratio=early_abort_ratio,
+        baseline_latency=baseline_latency)
@@ -1,10 +1,15 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
-from typing import Optional
+from typing import Dict, List, Optional
 from bitblas.base.arch import TileDevice
+from bitblas.common import BITBLAS_DEFAULT_CACHE_PATH
+import contextlib
 import ctypes
+import functools
+import hashlib
 import os
 import os.path as osp
+import shutil
 import sys
 import tempfile
 import subprocess
@@ -12,6 +17,37 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Compiled libraries are shared on disk, keyed by the hash of the source and
+# the compile command, and the loaded handles are shared within the process.
+BITBLAS_LIB_CACHE_PATH = osp.join(BITBLAS_DEFAULT_CACHE_PATH, "libs")
+# the least recently used libraries are evicted beyond this number of entries
+BITBLAS_LIB_CACHE_SIZE = int(os.environ.get("BITBLAS_LIB_CACHE_SIZE", "4096"))
+_LOADED_LIBS: Dict[str, ctypes.CDLL] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_compiler_version(compiler: str) -> str:
+    """The version banner of the compiler, a toolkit upgrade invalidates the cached libs."""
+    try:
+        return subprocess.check_output([compiler, "--version"], stderr=subprocess.STDOUT).decode()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _evict_lib_cache(cache_path: str, max_entries: int):
+    libs: List[str] = [
+        osp.join(cache_path, name) for name in os.listdir(cache_path) if name.endswith(".so")
+    ]
+    if len(libs) <= max_entries:
+        return
+    libs.sort(key=osp.getmtime)
+    for lib in libs[:len(libs) - max_entries]:
+        stem = osp.splitext(lib)[0]
+        for path in (lib, stem + ".cu", stem + ".cpp"):
+            # processes that loaded the lib keep their mapping
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
 
 class LibraryGenerator(object):
     srcpath: Optional[str] = None
@@ -26,15 +62,16 @@ class LibraryGenerator(object):
 
     # Assume currently we only support CUDA compilation
     def load_lib(self):
-        return ctypes.CDLL(self.libpath)
+        if self.libpath not in _LOADED_LIBS:
+            _LOADED_LIBS[self.libpath] = ctypes.CDLL(self.libpath)
+        return _LOADED_LIBS[self.libpath]
 
     def compile_lib(self, timeout: float = None, with_tl: bool = False):
         arch = self.arch
         platform = arch.platform
         if platform == "CUDA":
-            src = tempfile.NamedTemporaryFile(mode="w", suffix=".cu", delete=False)
+            suffix = ".cu"
             compute_version = arch.compute_capability
-            libpath = src.name.replace(".cu", ".so")
 
             command = [
                 "nvcc",
@@ -45,22 +82,19 @@ class LibraryGenerator(object):
                 "'-fPIC'",
                 "-lineinfo",
                 "--shared",
-                src.name,
                 "-lcuda",
                 "-gencode",
                 f"arch=compute_{compute_version},code=sm_{compute_version}",
             ]
 
         elif platform == "CDNA":
-            src = tempfile.NamedTemporaryFile(mode="w", suffix=".cpp", delete=False)
-            libpath = src.name.replace(".cpp", ".so")
+            suffix = ".cpp"
 
             command = [
                 "hipcc",
                 "-std=c++17",
                 "-fPIC",
                 "--shared",
-                src.name,
             ]
 
         else:
@@ -91,6 +125,24 @@ class LibraryGenerator(object):
                 "-I" + cutlass_path,
             ]
             command += ["-diag-suppress=20013"]
+
+        lib_hash = hashlib.sha256("\0".join(
+            [self.lib_code, str(arch.target),
+             get_compiler_version(command[0])] + command).encode()).hexdigest()
+        cached_srcpath = osp.join(BITBLAS_LIB_CACHE_PATH, lib_hash + suffix)
+        cached_libpath = osp.join(BITBLAS_LIB_CACHE_PATH, lib_hash + ".so")
+        if osp.exists(cached_libpath) and osp.exists(cached_srcpath):
+            # refresh the entry for the least recently used eviction
+            with contextlib.suppress(OSError):
+                os.utime(cached_libpath)
+            self.srcpath = cached_srcpath
+            self.libpath = cached_libpath
+            return
+
+        src = tempfile.NamedTemporaryFile(mode="w", suffix=suffix, delete=False)
+        libpath = src.name.replace(suffix, ".so")
+        # the source must precede the libraries it links against
+        command.insert(command.index("--shared") + 1, src.name)
         command += ["-o", libpath]
 
         src.write(self.lib_code)
@@ -103,11 +155,30 @@ class LibraryGenerator(object):
         if ret.returncode != 0:
             logger.warning(f"Compilation Failed! {command}")
             return None
-        self.srcpath = src.name
-        self.libpath = libpath
+
+        try:
+            os.makedirs(BITBLAS_LIB_CACHE_PATH, exist_ok=True)
+            shutil.copyfile(src.name, cached_srcpath)
+            # publish the library atomically in case of concurrent compilation
+            shutil.copyfile(libpath, cached_libpath + ".tmp" + str(os.getpid()))
+            os.replace(cached_libpath + ".tmp" + str(os.getpid()), cached_libpath)
+            self.srcpath = cached_srcpath
+            self.libpath = cached_libpath
+        except OSError as cache_error:
+            logger.debug(f"Failed to cache the compiled library: {cache_error}")
+            self.srcpath = src.name
+            self.libpath = libpath
+            return
+
+        # the cache holds its own copies now
+        for path in (src.name, libpath):
+            with contextlib.suppress(OSError):
+                os.remove(path)
+        _evict_lib_cache(BITBLAS_LIB_CACHE_PATH, BITBLAS_LIB_CACHE_SIZE)
 
     def remove_lib(self):
-        if self.libpath:
+        # cached libs are shared with other generators, only drop the reference
+        if self.libpath and osp.dirname(self.libpath) != osp.normpath(BITBLAS_LIB_CACHE_PATH):
             os.remove(self.libpath)
         self.libpath = None
 
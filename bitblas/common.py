@@ -6,3 +6,8 @@ import os
 BITBLAS_DEFAULT_CACHE_PATH = os.path.expanduser("~/.cache/bitblas")
 
 MAX_ERROR_MESSAGE_LENGTH = 500
+
+
+def get_build_workers(default: int = 10) -> int:
+    """Number of parallel build workers, overridable by BITBLAS_BUILD_WORKERS."""
+    return max(int(os.environ.get("BITBLAS_BUILD_WORKERS", default)), 1)
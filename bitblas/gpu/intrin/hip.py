@@ -150,6 +150,11 @@ def get_mfma_load_intrin(
     else:
         raise ValueError("k_dim must be 4 or 16 currently")
 
+    # the local elements of a thread are contiguous in shared memory for the
+    # [m, k] / [n, k] layouts, load them with a single vector ld (ds_read_b64)
+    is_contiguous = k_dim == 16 and (not is_b or transposed)
+    local_loop = T.vectorized if is_contiguous else T.serial
+
     @T.prim_func
     def mfma_load_desc(reg_handle: T.handle, memory_handle: T.handle) -> None:
         memory = T.match_buffer(
@@ -196,7 +201,7 @@ def get_mfma_load_intrin(
             T.reads(memory[0:row_dim, 0:col_dim])
             T.writes(reg[0:WARP_SIZE, 0:local_size])
             for tx in T.thread_binding(WARP_SIZE, "threadIdx.x"):
-                for local_id in T.serial(local_size):
+                for local_id in local_loop(local_size):
                     row, col = T.meta_var(reverse_index_map(tx, local_id))
                     reg[tx, local_id] = memory[row, col]
 
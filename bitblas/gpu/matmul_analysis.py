@@ -564,7 +564,7 @@ def get_tensorized_func_and_tags(
 
         # Nvidia Only Support Tensor Core for
         # devices greater than 70.
-        if check_sm_version(target.arch) < 70:
+        if target.kind.name == "cuda" and check_sm_version(target.arch) < 70:
             return False
         # analysis tensorcore axis
         # todo(lei): maybe we can remove this in the future
@@ -575,8 +575,8 @@ def get_tensorized_func_and_tags(
         # analysis pipeline stage
         # todo(lei): maybe we can integrate this into policy in the future
         tags["pipeline_stage"] = 1
-        if target.kind.name == "cuda" and check_sm_version(target.arch) == 80:
-            # enable pipeline stage only for sm_80 devices
+        if target.kind.name == "cuda" and check_sm_version(target.arch) >= 80:
+            # enable pipeline stage for ampere and later devices
             tags["pipeline_stage"] = 2
 
         # analysis async copy
@@ -646,7 +646,9 @@ def get_tensorized_func_and_tags(
         return func, None
 
     block_stmt = sch.get(main_block)
-    if target.kind.name == "cuda" and check_sm_version(target.arch) >= 70:
+    # hip targets lower to the matrix core (mfma) intrinsics
+    if ((target.kind.name == "cuda" and check_sm_version(target.arch) >= 70) or
+            target.kind.name == "hip"):
         in_dtype, out_dtype = get_in_out_dtypes(block_stmt)
         if not is_tensorcore_supported_precision(in_dtype, out_dtype, arch=get_arch(target)):
             logger.debug(
@@ -109,7 +109,9 @@ class MatmulTensorizationMFMA(GPUScheduleRule):
         a_lr = get_axis(micro_size_x, micro_size_k, intrin_info.trans_a)
         b_lr = get_axis(micro_size_k, micro_size_y, intrin_info.trans_b)
 
-        # matrix core not support swizzle
+        # matrix core not support swizzle, pad the shared memory instead
+        # to alleviate bank conflict
+        pad_offset = 8 if intrin_info.in_dtype == "float16" else 16
 
         warp_size = 64
 
@@ -146,6 +148,7 @@ class MatmulTensorizationMFMA(GPUScheduleRule):
             sch.bind(f_1, "threadIdx.y")
             sch.bind(f_0, "threadIdx.z")
             sch.vectorize(f_3)
+            sch.storage_align(block_read, 0, axis=-2, factor=16, offset=pad_offset)
 
         # fetch A,B to shared
         # 0->A, 1->B
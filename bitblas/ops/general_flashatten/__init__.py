@@ -171,6 +171,7 @@ class FlashAtten(Operator):
 
     def cleanup(self):
         self._free_workspace()
+        self._free_profile_tensors()
 
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         return self.forward(*args, **kwds)
@@ -757,6 +757,7 @@ class Matmul(Operator):
 
     def cleanup(self):
         self._free_workspace()
+        self._free_profile_tensors()
 
     @property
     def M(self):
@@ -12,16 +12,21 @@ import bitblas
 import ctypes
 from typing import List, Dict, Any, Optional, Tuple, Literal, Callable, Union
 import numpy as np
-from copy import deepcopy
+import torch
+from torch.utils.dlpack import to_dlpack
 from bitblas.base.base_scheduler import BaseScheduler
 from bitblas.base.tuner import fast_tune, fast_tune_with_dynamic_range
+from bitblas.base.utils import get_build_pass_config
 from bitblas.base.arch import get_arch, TileDevice, is_cuda_arch, is_cdna_arch, is_cpu_arch
 from bitblas.base.roller.hint import Hint
 from bitblas.builder.wrapper import TIRWrapper, TLWrapper
 from bitblas.builder.lib_generator import LibraryGenerator
 from bitblas.common import MAX_ERROR_MESSAGE_LENGTH
 from bitblas.utils import retrieve_func_from_module
+from bitblas.utils.nvrtc import nvrtc_compile_scope
+from contextlib import nullcontext
 from dataclasses import dataclass
+from collections import OrderedDict
 import logging
 import re
 
@@ -37,6 +42,27 @@ BUILD_RUNTIME_LIBRARY_FAILED_MESSAGE = ("Failed to build runtime library for ope
                                         "The error message: '{}' \n "
                                         "Please perform hardware-aware tuning manually.")
 
+# runtime modules recently built by any operator, keyed on the structural hash of
+# the scheduled module together with everything else that affects codegen.
+# Bounded in LRU order, the modules of evicted entries stay alive only as long
+# as an operator holds them.
+_BUILT_MOD_CACHE: "OrderedDict[Tuple, Tuple[IRModule, Module]]" = OrderedDict()
+_BUILT_MOD_CACHE_SIZE = 64
+
+# dtypes of profile tensors that can be generated directly on device with torch,
+# float8 is not supported by dlpack and stays on the numpy path.
+PROFILE_TORCH_DTYPE_MAP = {
+    "float64": torch.float64,
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "bfloat16": torch.bfloat16,
+    "int64": torch.int64,
+    "int32": torch.int32,
+    "int16": torch.int16,
+    "int8": torch.int8,
+    "uint8": torch.uint8,
+}
+
 
 @dataclass(frozen=True)
 class OperatorConfig:
@@ -130,6 +156,12 @@ class Operator(object):
             raise ValueError(f"Unsupported backend: {self.backend}")
 
         self.lib: Optional[ctypes.CDLL] = None
+        self._torch_func: Optional[Callable] = None
+
+        # the profile tensors of the last profiled shape, keyed by the resolved
+        # (name, shape, dtype) of each buffer and the dynamic symbolic constraints,
+        # so repeated profile_latency calls reuse the same device allocations.
+        self._profile_tensor_cache: Optional[Tuple[Tuple, List[tvm.nd.NDArray]]] = None
 
     def is_tir_backend(self):
         return self.backend == "tir"
@@ -174,28 +206,64 @@ class Operator(object):
             if self.scheduled_ir_module is None:
                 raise ValueError(f"No optimized function available for platform {self.arch}")
 
-            @tvm.register_func(func_name="tvm_callback_cuda_postproc", override=True)
-            def tvm_callback_cuda_postproc(code, _):
-                return self.post_process(code)
+            if type(self).post_process is not Operator.post_process:
+
+                @tvm.register_func(func_name="tvm_callback_cuda_postproc", override=True)
+                def tvm_callback_cuda_postproc(code, _):
+                    return self.post_process(code)
 
-            @tvm.register_func(func_name="tvm_callback_hip_postproc", override=True)
-            def tvm_callback_hip_postproc(code, _):
-                return self.post_process(code)
+                @tvm.register_func(func_name="tvm_callback_hip_postproc", override=True)
+                def tvm_callback_hip_postproc(code, _):
+                    return self.post_process(code)
+            else:
+                # identity post process, drop the hooks left by a previous
+                # operator to save the python round-trip per codegen.
+                for func_name in ("tvm_callback_cuda_postproc", "tvm_callback_hip_postproc"):
+                    if tvm.get_global_func(func_name, allow_missing=True) is not None:
+                        tvm._ffi.registry.remove_global_func(func_name)
+
+            if is_cuda_arch(self.arch) and self.is_tir_backend():
+                # jit the device code in-process with NVRTC instead of invoking nvcc
+                compile_scope = nvrtc_compile_scope(self.arch.compute_capability)
+            else:
+                compile_scope = nullcontext()
 
+            if self.is_tir_backend():
+                pass_config = get_build_pass_config()
+            else:
+                pass_config = {
+                    "tir.use_async_copy": True,
+                    "tir.disable_cse_tir": True,
+                }
+            pass_config.update(self.pass_context if self.pass_context else {})
             try:
-                with tvm.transform.PassContext(
-                        config={
-                            "tir.use_async_copy": True,
-                            "tir.disable_cse_tir": True,
-                            **(self.pass_context if self.pass_context else {}),
-                        }):
-                    if self.is_tir_backend():
-                        rt_mod = tvm.build(self.scheduled_ir_module, target=target)
-                    elif self.is_tilelang_backend():
-                        rt_mod = tilelang.lower(
-                            self.scheduled_ir_module, target=target, runtime_only=True)
-                    else:
-                        raise ValueError(f"Unsupported backend: {self.backend}")
+                # operators that schedule to the same module share the build, the
+                # post process is part of the key as it rewrites the device code.
+                cache_key = (
+                    tvm.ir.structural_hash(self.scheduled_ir_module),
+                    str(target),
+                    self.backend,
+                    type(self).post_process.__qualname__,
+                    repr(sorted(pass_config.items())),
+                )
+                cached = _BUILT_MOD_CACHE.get(cache_key)
+                if cached is not None and tvm.ir.structural_equal(cached[0],
+                                                                  self.scheduled_ir_module):
+                    rt_mod = cached[1]
+                    _BUILT_MOD_CACHE.move_to_end(cache_key)
+                else:
+                    with compile_scope, tvm.transform.PassContext(config=pass_config):
+                        if self.is_tir_backend():
+                            rt_mod = tvm.build(self.scheduled_ir_module, target=target)
+                        elif self.is_tilelang_backend():
+                            rt_mod = tilelang.lower(
+                                self.scheduled_ir_module, target=target, runtime_only=True)
+                        else:
+                            raise ValueError(f"Unsupported backend: {self.backend}")
+                    _BUILT_MOD_CACHE[cache_key] = (self.scheduled_ir_module, rt_mod)
+                    _BUILT_MOD_CACHE.move_to_end(cache_key)
+                    if len(_BUILT_MOD_CACHE) > _BUILT_MOD_CACHE_SIZE:
+                        _BUILT_MOD_CACHE.popitem(last=False)
             except Exception as build_runtime_error:  # noqa: F841
                 error_message = str(build_runtime_error)
                 # Truncate only if the message exceeds the maximum length
@@ -221,7 +289,7 @@ class Operator(object):
             # Initialize a time evaluator with the built module, specifying the device and the number of runs
             self.time_evaluator = rt_mod.time_evaluator(
                 rt_mod.entry_name, self.arch.device, number=10)
-            self.torch_func = to_pytorch_func(rt_mod)
+            self._torch_func = None
             if is_cuda_arch(self.arch) or is_cdna_arch(self.arch):
                 is_dynamic = (
                     self.dynamic_range is not None and len(self.scheduled_ir_module.functions) > 1)
@@ -244,7 +312,9 @@ class Operator(object):
         return None
 
     def apply_default_schedule(self, func_mod: IRModule, target: Target) -> IRModule:
-        mod_for_opt = deepcopy(func_mod)
+        # shallow clone, the pass only rebinds functions of the module and
+        # tir functions are immutable, so the original module is untouched
+        mod_for_opt = tvm.IRModule(func_mod.functions, attrs=func_mod.attrs)
         with target:
             scheduled_ir_module = (
                 bitblas.ApplyDefaultSchedule(  # pylint: disable=not-callable
@@ -386,32 +456,43 @@ class Operator(object):
         func = self.prim_func or retrieve_func_from_module(self.scheduled_ir_module)
         device = self.arch.device
 
-        def var_warpper(v):
-            if isinstance(v, tvm.tir.Var):
-                if v.name in dynamic_symbolic_constraints:
-                    return dynamic_symbolic_constraints[v.name]
-                assert "opt_shapes" in func.attrs
-                assert v.name in func.attrs["opt_shapes"]
-                if isinstance(func.attrs["opt_shapes"][v.name], tvm.tir.IntImm):
-                    return func.attrs["opt_shapes"][v.name].value
-                elif isinstance(func.attrs["opt_shapes"][v.name], tvm.ir.container.Array):
-                    avg_shape: int = 0
-                    for i in func.attrs["opt_shapes"][v.name]:
-                        avg_shape += i.value
-                    avg_shape = avg_shape // len(func.attrs["opt_shapes"][v.name])
-                    _info_message = (
-                        f"Doesn't provide dynamic symbolic constrains for {v.name} when do benchmarking, "
-                        f"use average shape {avg_shape}")
-                    logger.info(_info_message)
-                    return avg_shape
-                else:
-                    raise RuntimeError("Not supported type: ",
-                                       type(func.attrs["opt_shapes"][v.name]))
-
-            elif isinstance(v, tvm.tir.IntImm):
-                return v.value
+        opt_shapes = func.attrs["opt_shapes"] if func.attrs and "opt_shapes" in func.attrs else None
+
+        def _var_shape(v):
+            if v.name in dynamic_symbolic_constraints:
+                return dynamic_symbolic_constraints[v.name]
+            assert opt_shapes is not None
+            assert v.name in opt_shapes
+            opt_shape = opt_shapes[v.name]
+            if isinstance(opt_shape, tvm.tir.IntImm):
+                return opt_shape.value
+            elif isinstance(opt_shape, tvm.ir.container.Array):
+                avg_shape: int = 0
+                for i in opt_shape:
+                    avg_shape += i.value
+                avg_shape = avg_shape // len(opt_shape)
+                _info_message = (
+                    f"Doesn't provide dynamic symbolic constrains for {v.name} when do benchmarking, "
+                    f"use average shape {avg_shape}")
+                logger.info(_info_message)
+                return avg_shape
             else:
+                raise RuntimeError("Not supported type: ", type(opt_shape))
+
+        def _imm_shape(v):
+            return v.value
+
+        shape_dispatch = {
+            tvm.tir.IntImm: _imm_shape,
+            tvm.tir.Var: _var_shape,
+            tvm.tir.SizeVar: _var_shape,
+        }
+
+        def var_warpper(v):
+            handler = shape_dispatch.get(type(v))
+            if handler is None:
                 raise RuntimeError("Not supported type: ", type(v))
+            return handler(v)
 
         def map_numpy_type(intype):
             typemap = {
@@ -423,31 +504,68 @@ class Operator(object):
             else:
                 return intype
 
+        # in case of dynamic symbolic may in params
+        buffer_params = [param for param in func.params if param in func.buffer_map]
+        buffer_shapes = [
+            tuple(var_warpper(i) for i in func.buffer_map[param].shape) for param in buffer_params
+        ]
+        cache_key = (
+            tuple((param.name, shape, func.buffer_map[param].dtype)
+                  for param, shape in zip(buffer_params, buffer_shapes)),
+            tuple(sorted(dynamic_symbolic_constraints.items())),
+        )
+        if self._profile_tensor_cache is not None and self._profile_tensor_cache[0] == cache_key:
+            return self._profile_tensor_cache[1]
+        # release the tensors of the previous shape before allocating the new ones
+        self._profile_tensor_cache = None
+
+        def device_tensor(shape, dtype):
+            # fill the tensor on device to skip the host buffer and the H2D copy
+            torch_dtype = PROFILE_TORCH_DTYPE_MAP[dtype]
+            torch_device = torch.device("cuda", device.device_id)
+            if torch_dtype.is_floating_point:
+                tensor = torch.empty(shape, dtype=torch_dtype, device=torch_device).uniform_(0, 1)
+            else:
+                # small integers in the int4/int8 range instead of the zeros that
+                # uniform(0, 1) truncates to, so quantized kernels see real data
+                low = 0 if dtype.startswith("uint") else -8
+                tensor = torch.randint(low, 8, shape, dtype=torch_dtype, device=torch_device)
+            return tvm.runtime.ndarray.from_dlpack(to_dlpack(tensor))
+
         profile_tensors = []
-        for param in func.params:
-            if param not in func.buffer_map:
-                # in case of dynamic symbolic may in params
-                continue
+        for param, shape in zip(buffer_params, buffer_shapes):
             arg = func.buffer_map[param]
+            if not is_cpu_arch(self.arch) and arg.dtype in PROFILE_TORCH_DTYPE_MAP:
+                profile_tensors.append(device_tensor(shape, arg.dtype))
+                continue
             numpy_dtype = map_numpy_type(arg.dtype)
-            profile_tensors.append(
-                tvm.nd.array(
-                    np.random.uniform(0, 1,
-                                      [var_warpper(i) for i in arg.shape]).astype(numpy_dtype),
-                    device=device,
-                ))
+            if arg.dtype.startswith("int") or arg.dtype.startswith("uint"):
+                low = 0 if arg.dtype.startswith("uint") else -8
+                host_tensor = np.random.randint(low, 8, shape).astype(numpy_dtype)
+            else:
+                host_tensor = np.random.uniform(0, 1, shape).astype(numpy_dtype)
+            profile_tensors.append(tvm.nd.array(host_tensor, device=device))
+        self._profile_tensor_cache = (cache_key, profile_tensors)
         return profile_tensors
 
+    def _free_profile_tensors(self):
+        self._profile_tensor_cache = None
+
     def profile_latency(self, dynamic_symbolic_constraints: Optional[Dict] = None) -> str:
         if dynamic_symbolic_constraints is None:
             dynamic_symbolic_constraints = {}
         profile_tensors = self.get_profile_tensors(dynamic_symbolic_constraints)
         latency = self.time_evaluator(*profile_tensors).mean * 1e3
-        # release the memory of profile tensors
-        for tensor in profile_tensors:
-            del tensor
         return latency
 
+    @property
+    def torch_func(self) -> Optional[Callable]:
+        # the dlpack wrapper is created on the first torch call and reused,
+        # operators served by the prebuilt lib never create it.
+        if self._torch_func is None and self.rt_mod is not None:
+            self._torch_func = to_pytorch_func(self.rt_mod)
+        return self._torch_func
+
     def _forward_from_torch_func(self, *args):
         # Torch func is not reliable as the runtime overhead dlpack
         # is not negaliable, ref to https://discuss.tvm.apache.org/t/strange-overhead-of-tvm-runtime-ndarray-from-dlpack/16516
@@ -472,7 +590,7 @@ class Operator(object):
             self.rt_mod = rt_mod
             self.time_evaluator = rt_mod.time_evaluator(
                 rt_mod.entry_name, self.arch.device, number=10)
-            self.torch_func = to_pytorch_func(rt_mod)
+            self._torch_func = None
         if srcpath is not None:
             assert self.lib_generator is not None, "lib_generator is not initialized"
             self.lib_generator.set_src_path(srcpath)
@@ -542,10 +660,9 @@ class OPExecutorCPU:
         return len(self.operators) == 0
 
     def forward(self, weight):
-        inputs = [weight]
         for op in self.operators:
-            inputs = [op.forward(*inputs)]
-        return inputs[-1]
+            weight = op.forward(weight)
+        return weight
 
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         return self.forward(*args, **kwds)
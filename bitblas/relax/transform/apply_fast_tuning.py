@@ -78,15 +78,24 @@ class ApplyFastTuning:  # pylint: disable=too-few-public-methods
         meta_database_dir: str = None,
         whitelist: Optional[List[str]] = None,
         dynamic_range: Optional[Dict[str, List[int]]] = None,
+        early_abort_ratio: Optional[float] = 3.0,
+        patience: Optional[int] = None,
     ):
         """Construct a new ApplyFastTuning pass.
 
         Parameters
         ----------
-        meta_database : str
-            The path of database.
+        meta_database_dir : str
+            The path of database, the tuning records saved there by previous
+            runs are loaded so that only new workloads are tuned.
         dynamic_range : Dict[str, List[int]]
             Use for generate kernel based on dynamic range.
+        early_abort_ratio : Optional[float]
+            Skip the full measurement of a candidate whose single probe run is
+            slower than early_abort_ratio times the current best, None to disable.
+        patience : Optional[int]
+            Tune the topk configs in small batches and stop after `patience`
+            batches without improvement, None to tune all of them.
         """
         if whitelist is None:
             whitelist = []
@@ -98,11 +107,57 @@ class ApplyFastTuning:  # pylint: disable=too-few-public-methods
         self.meta_database_dir = meta_database_dir
         self.whitelist = whitelist
         self.dynamic_range = dynamic_range
+        self.early_abort_ratio = early_abort_ratio
+        self.patience = patience
         self.temp_dir = tempfile.TemporaryDirectory()
-        path_workload = osp.join(self.temp_dir.name, "database_workload.json")
-        path_tuning_record = osp.join(self.temp_dir.name, "database_tuning_record.json")
+        self.path_workload = osp.join(self.temp_dir.name, "database_workload.json")
+        self.path_tuning_record = osp.join(self.temp_dir.name, "database_tuning_record.json")
+        if meta_database_dir is not None and osp.exists(meta_database_dir):
+            for path in (self.path_workload, self.path_tuning_record):
+                saved_path = osp.join(meta_database_dir, osp.basename(path))
+                if osp.exists(saved_path):
+                    shutil.copy(saved_path, path)
+        try:
+            self.cache_meta_database = ms.database.JSONDatabase(
+                self.path_workload, self.path_tuning_record, module_equality="structural")
+        except Exception as load_error:
+            logger.warning(f"Failed to load the database from {meta_database_dir}, "
+                           f"fallback to an empty one: {load_error}")
+            self._reset_database()
+
+    def _reset_database(self):
+        for path in (self.path_workload, self.path_tuning_record):
+            if osp.exists(path):
+                os.remove(path)
         self.cache_meta_database = ms.database.JSONDatabase(
-            path_workload, path_tuning_record, module_equality="structural")
+            self.path_workload, self.path_tuning_record, module_equality="structural")
+
+    def _query_tuning_record(self, workload: ms.database.Workload, target: Target):
+        # JSONDatabase.query_tuning_record ignores the target, a database
+        # shared across devices may hold records of other targets.
+        for record in self.cache_meta_database.get_top_k(workload, len(self.cache_meta_database)):
+            if str(record.target) == str(target):
+                return record
+        return None
+
+    def _drop_tuning_records(self, workload: ms.database.Workload, target: Target):
+        # JSONDatabase cannot delete records, rebuild it without the records of
+        # the workload on target so a stale record does not stay the best one.
+        records = [
+            record for record in self.cache_meta_database.get_all_tuning_records()
+            if str(record.target) != str(target) or
+            not tvm.ir.structural_equal(record.workload.mod, workload.mod)
+        ]
+        self._reset_database()
+        for record in records:
+            self.cache_meta_database.commit_tuning_record(
+                ms.database.TuningRecord(
+                    record.trace,
+                    self.cache_meta_database.commit_workload(record.workload.mod),
+                    record.run_secs,
+                    record.target,
+                    record.args_info,
+                ))
 
     def _in_white_list(self, func_name: str) -> bool:
         if len(self.whitelist) == 0:
@@ -125,17 +180,22 @@ class ApplyFastTuning:  # pylint: disable=too-few-public-methods
                 _normalized_func_mod = normalize_mod_func_(func)
 
                 if self.cache_meta_database.has_workload(_normalized_func_mod):
-                    tuning_record = self.cache_meta_database.query_tuning_record(
-                        _normalized_func_mod,
-                        target,
-                        g_var.name_hint,
-                    )
+                    tuning_record = self._query_tuning_record(
+                        self.cache_meta_database.commit_workload(_normalized_func_mod), target)
                     if tuning_record:
-                        trace = tuning_record.trace
-                        sch = tvm.tir.Schedule(func)
-                        trace.apply_to_schedule(sch, remove_postproc=False)
-                        updated_functions[g_var] = sch.mod["main"].with_attr("tir.is_scheduled", 1)
-                        continue
+                        # records loaded from meta_database_dir may come from another
+                        # version or use intrinsics that are not registered, tune again.
+                        try:
+                            trace = tuning_record.trace
+                            sch = tvm.tir.Schedule(func)
+                            trace.apply_to_schedule(sch, remove_postproc=False)
+                            updated_functions[g_var] = sch.mod["main"].with_attr(
+                                "tir.is_scheduled", 1)
+                            continue
+                        except Exception as replay_error:
+                            logger.warning(f"Failed to replay the tuning record of "
+                                           f"{g_var.name_hint}, tune it again: {replay_error}")
+                            self._drop_tuning_records(tuning_record.workload, target)
 
                 specalized_function = func.with_attr("global_symbol", g_var.name_hint)
 
@@ -148,6 +208,8 @@ class ApplyFastTuning:  # pylint: disable=too-few-public-methods
                         parallel_build=self.parallel_build,
                         global_symbol=g_var.name_hint,
                         dynamic_range=self.dynamic_range,
+                        early_abort_ratio=self.early_abort_ratio,
+                        patience=self.patience,
                     )
 
                     if dispatch_mod:
@@ -167,6 +229,8 @@ class ApplyFastTuning:  # pylint: disable=too-few-public-methods
                         target=target,
                         topk=self.topk,
                         parallel_build=self.parallel_build,
+                        early_abort_ratio=self.early_abort_ratio,
+                        patience=self.patience,
                     )
 
                     if best is not None:
@@ -4,6 +4,7 @@ import sys
 import inspect
 import pytest
 from bitblas.base import DefaultPolicy, TensorCorePolicy
+from bitblas.base.arch import CDNA, TileDevice
 from bitblas.gpu.matmul_analysis import get_tensorized_func_and_tags
 from tvm.testing.utils import *
 
@@ -14,6 +15,33 @@ def main():
     sys.exit(pytest.main([test_file] + sys.argv[1:]))
 
 
+class StubCUDA(TileDevice):
+    """A100 like CUDA arch that does not query a device, for the tests that run without a GPU."""
+
+    def __init__(self, target="cuda -arch=sm_80"):
+        super().__init__()
+        self.target = target
+        self.platform = "CUDA"
+        self.compute_capability = "80"
+        self.reg_cap = 65536
+        self.smem_cap = 49152
+        self.max_smem_usage = 2 * self.smem_cap
+        self.compute_max_core = 108
+        self.warp_size = 32
+        self.sm_partition = 4
+        self.transaction_size = [32, 128]
+        self.bandwidth = [750, 12080]
+
+
+class StubCDNA(CDNA):
+    """CDNA arch that does not query a ROCm device."""
+
+    def __init__(self, target="hip"):
+        TileDevice.__init__(self)
+        self.target = target
+        self.platform = "CDNA"
+
+
 def debug_with_schedule(func, arch, sch_rule):
     policy = DefaultPolicy(func=func, arch=arch)
     try:
@@ -20,7 +20,7 @@ from bitblas.utils import (
     tensor_remove_make_int2,
     retrieve_func_from_module,
 )
-from bitblas.common import MAX_ERROR_MESSAGE_LENGTH
+from bitblas.common import MAX_ERROR_MESSAGE_LENGTH, get_build_workers
 from bitblas.base.base_scheduler import BaseScheduler
 
 logger = logging.getLogger(__name__)
@@ -197,6 +197,6 @@ def apply_and_build(
     parallel_build=False,
     data_distribution="uniform",
 ) -> Tuple[List[CompileResult], CompileResult]:
-    max_workers = 10 if parallel_build else 1
+    max_workers = get_build_workers() if parallel_build else 1
     return apply_and_build_parallel(
         scheduler, configs, arch, max_workers=max_workers, data_distribution=data_distribution)
@@ -0,0 +1,115 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import os
+from contextlib import contextmanager
+from typing import List, Optional
+from bitblas import tvm
+from tvm.contrib import nvcc
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Either "nvrtc" (in-process device JIT) or "nvcc" (fork/exec the nvcc toolchain).
+CUDA_COMPILE_MODE_ENV = "TVM_CUDA_COMPILE_MODE"
+
+
+def get_cuda_compile_mode() -> str:
+    mode = os.environ.get(CUDA_COMPILE_MODE_ENV, "nvrtc").lower()
+    if mode not in ("nvrtc", "nvcc"):
+        logger.warning(f"Unknown {CUDA_COMPILE_MODE_ENV}={mode}, fallback to nvcc.")
+        return "nvcc"
+    return mode
+
+
+def is_nvrtc_available() -> bool:
+    try:
+        from cuda import nvrtc  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _get_nvrtc_include_options() -> List[bytes]:
+    include_paths = []
+    cuda_path = nvcc.find_cuda_path()
+    if cuda_path is not None:
+        include_paths.append(os.path.join(cuda_path, "include"))
+    if "TL_CUTLASS_PATH" in os.environ:
+        include_paths.append(os.environ["TL_CUTLASS_PATH"])
+    return [f"-I{path}".encode() for path in include_paths]
+
+
+def compile_cuda_with_nvrtc(code: str, compute_version: str) -> bytearray:
+    """Compile the cuda source into a cubin with NVRTC.
+
+    Args:
+        code (str): The cuda source code.
+        compute_version (str): The compute capability without dot, e.g. "80".
+
+    Returns:
+        bytearray: The compiled cubin.
+    """
+    from cuda import nvrtc  # pylint: disable=import-outside-toplevel
+
+    def check(result):
+        err, *values = result
+        if err != nvrtc.nvrtcResult.NVRTC_SUCCESS:
+            raise RuntimeError(f"NVRTC error: {err}")
+        return values[0] if len(values) == 1 else values
+
+    prog = check(nvrtc.nvrtcCreateProgram(code.encode(), b"bitblas_kernel.cu", 0, [], []))
+    options = [
+        f"--gpu-architecture=sm_{compute_version}".encode(),
+        b"-default-device",
+        b"-std=c++17",
+    ] + _get_nvrtc_include_options()
+    try:
+        err, = nvrtc.nvrtcCompileProgram(prog, len(options), options)
+        if err != nvrtc.nvrtcResult.NVRTC_SUCCESS:
+            log_size = check(nvrtc.nvrtcGetProgramLogSize(prog))
+            log = b" " * log_size
+            check(nvrtc.nvrtcGetProgramLog(prog, log))
+            raise RuntimeError(f"NVRTC compilation failed: {log.decode(errors='ignore')}")
+        cubin_size = check(nvrtc.nvrtcGetCUBINSize(prog))
+        cubin = b" " * cubin_size
+        check(nvrtc.nvrtcGetCUBIN(prog, cubin))
+    finally:
+        nvrtc.nvrtcDestroyProgram(prog)
+    return bytearray(cubin)
+
+
+@contextmanager
+def nvrtc_compile_scope(compute_version: Optional[str] = None):
+    """Compile the cuda device code of the builds inside the scope with NVRTC.
+
+    tvm's `tvm_callback_cuda_compile` is a process global, it is overridden on
+    entry and the previous callback is restored on exit, so builds outside the
+    scope keep using nvcc. Falls back to nvcc when NVRTC is disabled, unavailable,
+    or fails on the source.
+    """
+    if get_cuda_compile_mode() != "nvrtc" or not is_nvrtc_available():
+        yield
+        return
+
+    func_name = "tvm_callback_cuda_compile"
+    prev_callback = tvm.get_global_func(func_name, allow_missing=True)
+
+    @tvm.register_func(func_name=func_name, override=True)
+    def tvm_callback_cuda_compile(code, target=None):
+        version = compute_version
+        if version is None:
+            version = nvcc.get_target_compute_version(target).replace(".", "")
+        try:
+            return compile_cuda_with_nvrtc(code, version)
+        except Exception as nvrtc_error:  # noqa: F841
+            logger.debug(f"NVRTC compilation failed, fallback to nvcc: {nvrtc_error}")
+            return nvcc.compile_cuda(code, target_format="fatbin")
+
+    try:
+        yield
+    finally:
+        if prev_callback is not None:
+            tvm.register_func(func_name, prev_callback, override=True)
+        else:
+            tvm._ffi.registry.remove_global_func(func_name)
@@ -0,0 +1,17 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import itertools
+import os
+
+# next() on itertools.count is atomic, dumps from several threads get unique indices
+_dump_counter = itertools.count()
+
+
+def write_code(code: str, path: str, fname: str) -> str:
+    """Write a dump into `path`, prefixed with an index in the order of the dumps."""
+    fname = f"{next(_dump_counter)}.{fname}"
+    os.makedirs(path, exist_ok=True)
+    fname = os.path.join(path, fname)
+    with open(fname, "w") as f:
+        f.write(code)
+    return fname
@@ -27,26 +27,14 @@ from tvm.target.target import Target
 import tvm.relay.testing
 from tvm.ir.module import IRModule
 from bitblas.relax import ApplyDefaultSchedule, ApplyFastTuning
+from dump_utils import write_code
 
 fname = os.path.basename(__file__)
 fname = os.path.splitext(fname)[0]
 # get current file path
 log_path = os.path.dirname(os.path.abspath(__file__)) + "/progress/" + fname
 
-count = 0
-
-bitblas.set_log_level("Debug")
-
-
-def write_code(code, path, fname):
-    global count
-    fname = str(count) + "." + fname
-    count += 1
-    if not os.path.exists(path):
-        os.makedirs(path)
-    fname = os.path.join(path, fname)
-    with open(fname, "w") as f:
-        f.write(code)
+bitblas.set_log_level(os.environ.get("BITBLAS_LOG_LEVEL", "Info"))
 
 
 def write_sch(sch, path, fname):
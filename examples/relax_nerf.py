@@ -15,6 +15,7 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import argparse
 import numpy as np
 import os
 from typing import Dict
@@ -26,72 +27,154 @@ from tvm.relax.testing import relay_translator, nn
 from tvm.target.target import Target
 import tvm.relay.testing
 from tvm.ir.module import IRModule
-from bitblas.relax import ApplyDefaultSchedule, ApplyFastTuning
+from bitblas.relax import ApplyDefaultSchedule, ApplyFastTuning, WeightOnlyLayoutPropagation
+from dump_utils import write_code
 
 fname = os.path.basename(__file__)
 fname = os.path.splitext(fname)[0]
 # get current file path
 log_path = os.path.dirname(os.path.abspath(__file__)) + "/progress/" + fname
 
-count = 0
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--fp32", action="store_true", help="Keep the model in float32 (no tensor core lowering)")
+parser.add_argument(
+    "--fuse-max-depth",
+    type=int,
+    default=8,
+    help="Maximum number of ops fused into one kernel, smaller groups are faster to tune")
+args = parser.parse_args()
 
-bitblas.set_log_level("Debug")
+# dump the IR after every pass into log_path, set BITBLAS_DUMP_IR=1 to enable
+dump_ir = bool(int(os.environ.get("BITBLAS_DUMP_IR", "0")))
 
-
-def write_code(code, path, fname):
-    global count
-    fname = str(count) + "." + fname
-    count += 1
-    if not os.path.exists(path):
-        os.makedirs(path)
-    fname = os.path.join(path, fname)
-    with open(fname, "w") as f:
-        f.write(code)
+bitblas.set_log_level(os.environ.get("BITBLAS_LOG_LEVEL", "Info"))
 
 
 def write_sch(sch, path, fname):
-    py_fname = fname + ".py"
-    write_code(sch.mod["main"].script(), path, py_fname)
-    cu_fname = fname + ".cu"
-    write_code(sch.mod.astext(), path, cu_fname)
+    if not dump_ir:
+        return
+    write_code(sch.mod["main"].script(), path, fname + ".py")
 
 
 def write_mod(mod, path, fname):
-    py_fname = fname + ".py"
-    write_code(mod.script(show_meta=False), path, py_fname)
-    cu_fname = fname + ".cu"
-    write_code(mod.astext(show_meta_data=False), path, cu_fname)
+    if not dump_ir:
+        return
+    write_code(mod.script(show_meta=False), path, fname + ".py")
+
 
 from tvm.relay.frontend.onnx import from_onnx
 import onnx
 
 model_path = "/root/BitBLAS/examples/NeRF-b128/model.onnx"
-onnx_model = onnx.load(model_path)
-relay_mod, params = from_onnx(onnx_model)
+# the exported model is only deployed with this batch size
+batch_size = 128
+
+
+def load_relay_from_onnx(model_path: str):
+    # the import is deterministic, cache it next to the model and reuse it
+    # until the onnx file is modified.
+    mod_cache_path = model_path + ".relay.json"
+    params_cache_path = model_path + ".relay.params"
+    if all(
+            os.path.exists(path) and os.path.getmtime(path) > os.path.getmtime(model_path)
+            for path in (mod_cache_path, params_cache_path)):
+        with open(mod_cache_path, "r") as f:
+            relay_mod = tvm.ir.load_json(f.read())
+        with open(params_cache_path, "rb") as f:
+            params = relay.load_param_dict(f.read())
+        return relay_mod, params
+
+    relay_mod, params = from_onnx(onnx.load(model_path))
+    with open(mod_cache_path, "w") as f:
+        f.write(tvm.ir.save_json(relay_mod))
+    with open(params_cache_path, "wb") as f:
+        f.write(relay.save_param_dict(params))
+    return relay_mod, params
+
+
+def downcast_params(relay_mod: IRModule, params: Dict[str, runtime.NDArray], dtype: str):
+    # store the float32 params in dtype and cast them back inside the graph,
+    # the cast pairs cancel out in the mixed precision graph once the params are folded.
+    main_func = relay_mod["main"]
+    new_params = []
+    bindings = {}
+    for var in main_func.params:
+        if var.name_hint not in params or params[var.name_hint].dtype != "float32":
+            new_params.append(var)
+            continue
+        new_var = relay.var(var.name_hint, shape=var.type_annotation.shape, dtype=dtype)
+        bindings[var] = relay.cast(new_var, "float32")
+        new_params.append(new_var)
+    body = relay.bind(main_func.body, bindings)
+    relay_mod = IRModule.from_expr(
+        relay.Function(new_params, body, type_params=main_func.type_params, attrs=main_func.attrs))
+    params = {
+        name: tvm.nd.array(param.numpy().astype(dtype)) if param.dtype == "float32" else param
+        for name, param in params.items()
+    }
+    return relay_mod, params
+
+
+relay_mod, params = load_relay_from_onnx(model_path)
 
 target = tvm.target.Target("cuda")
-dtype = "float32"
-
-def apply_opt_before_tuning(relay_mod: IRModule, params: Dict[str, runtime.NDArray], target: Target):
+dtype = "float32" if args.fp32 else "float16"
+if dtype == "float16":
+    relay_mod, params = downcast_params(relay_mod, params, dtype)
+    # the casts on the params are folded once they are bound as constants,
+    # float16 matmuls are then picked up by the tensor core policy
+    relay_mod = relay.transform.InferType()(relay_mod)
+    relay_mod = relay.transform.ToMixedPrecision(dtype)(relay_mod)
+
+
+def has_op(func: relay.Function, op_name: str) -> bool:
+    found = []
+
+    def visit(expr):
+        if isinstance(expr, relay.Call) and isinstance(expr.op,
+                                                       tvm.ir.Op) and expr.op.name == op_name:
+            found.append(expr)
+
+    relay.analysis.post_order_visit(func, visit)
+    return len(found) > 0
+
+
+def run_relay_passes(relay_mod: IRModule, passes) -> IRModule:
+    # a single Sequential skips the redundant type inference between passes,
+    # run them one by one only when every intermediate module is dumped.
+    if not dump_ir:
+        return transform.Sequential(passes, opt_level=3)(relay_mod)
+    for relay_pass in passes:
+        relay_mod = relay_pass(relay_mod)
+        write_mod(relay_mod, log_path, relay_pass.info.name)
+    return relay_mod
+
+
+def apply_opt_before_tuning(relay_mod: IRModule,
+                            params: Dict[str, runtime.NDArray],
+                            target: Target,
+                            fuse_max_depth: int = 8):
     with transform.PassContext(opt_level=3):
         main_func = relay_mod["main"]
         bind_main_func = relay.build_module.bind_params_by_name(main_func, params)
         relay_mod = IRModule.from_expr(bind_main_func)
         write_mod(relay_mod, log_path, "create_mod")
-        relay_mod = relay.transform.SimplifyInference()(relay_mod)
-        write_mod(relay_mod, log_path, "SimplifyInference")
-        relay_mod = relay.transform.ConvertLayout({"nn.conv2d": ["NHWC", "default"]})(relay_mod)
-        write_mod(relay_mod, log_path, "ConvertLayout")
-        relay_mod = relay.transform.FoldConstant()(relay_mod)
-        write_mod(relay_mod, log_path, "FoldConstant")
-        relay_mod = relay.transform.FoldScaleAxis()(relay_mod)
-        write_mod(relay_mod, log_path, "FoldScaleAxis")
-        relay_mod = relay.transform.CanonicalizeOps()(relay_mod)
-        write_mod(relay_mod, log_path, "CanonicalizeOps")
-        relay_mod = relay.transform.AlterOpLayout()(relay_mod)
-        write_mod(relay_mod, log_path, "AlterOpLayout")
-        relay_mod = relay.transform.FoldConstant()(relay_mod)
-        write_mod(relay_mod, log_path, "FoldConstant")
+        # the layout passes only rewrite conv2d, skip them for the pure dense NeRF MLP
+        has_conv = has_op(relay_mod["main"], "nn.conv2d")
+        passes = [relay.transform.SimplifyInference()]
+        if has_conv:
+            passes.append(relay.transform.ConvertLayout({"nn.conv2d": ["NHWC", "default"]}))
+        passes += [
+            relay.transform.FoldConstant(),
+            # freeze the shapes, so the translated tir is fully static for tuning
+            relay.transform.DynamicToStatic(),
+            relay.transform.FoldScaleAxis(),
+            relay.transform.CanonicalizeOps(),
+        ]
+        if has_conv:
+            passes += [relay.transform.AlterOpLayout(), relay.transform.FoldConstant()]
+        relay_mod = run_relay_passes(relay_mod, passes)
 
         # opt_level=2 and select_impl_strategy are required for avoiding winograd lowering
         relax_mod = relay_translator.from_relay(
@@ -101,20 +184,40 @@ def apply_opt_before_tuning(relay_mod: IRModule, params: Dict[str, runtime.NDArr
             append_op_attrs=True,
             select_impl_strategy="first")
         write_mod(relax_mod, log_path, "relay_translator_relax")
+        symbolic_vars = relax.analysis.defined_symbolic_vars(relax_mod["main"])
+        if any(var.name == "batch" for var in symbolic_vars):
+            relax_mod = relax.transform.BindSymbolicVars({"batch": batch_size})(relax_mod)
+            write_mod(relax_mod, log_path, "BindSymbolicVars")
         relax_mod = relax.transform.AnnotateTIROpPattern()(relax_mod)
         write_mod(relax_mod, log_path, "AnnotateTIROpPattern")
-        relax_mod = relax.transform.FuseOps()(relax_mod)
+        with transform.PassContext(opt_level=3, config={"relax.FuseOps.max_depth": fuse_max_depth}):
+            relax_mod = relax.transform.FuseOps()(relax_mod)
         write_mod(relax_mod, log_path, "FuseOps")
         relax_mod = relax.transform.FuseTIR()(relax_mod)
         write_mod(relax_mod, log_path, "FuseTIR")
+        if dtype == "float16":
+            # pre-pack the bound dense weights into the tensor core tile layout,
+            # the inserted layout_transform is folded into the constants once.
+            relax_mod = WeightOnlyLayoutPropagation(transform_level=1, target=target)(relax_mod)
+            relax_mod = relax.transform.LegalizeOps()(relax_mod)
+            relax_mod = relax.transform.FoldConstant()(relax_mod)
+            write_mod(relax_mod, log_path, "WeightOnlyLayoutPropagation")
     return relax_mod
 
-relax_mod = apply_opt_before_tuning(relay_mod, params, target)
+
+relax_mod = apply_opt_before_tuning(relay_mod, params, target, args.fuse_max_depth)
 
 #print(relax_mod)
 
 start_tune_time = time.time()
-relax_mod = ApplyFastTuning(topk=20, target=target, parallel_build=False)(relax_mod)
+fast_tuning = ApplyFastTuning(
+    topk=20,
+    target=target,
+    parallel_build=True,
+    patience=2,
+    meta_database_dir=os.path.join(bitblas.cache.get_database_path(), fname),
+)
+relax_mod = fast_tuning(relax_mod)
 end_tune_time = time.time()
 
-write_code(relax_mod, log_path, "apply_opt_before_tuning")
\ No newline at end of file
+write_mod(relax_mod, log_path, "ApplyFastTuning")
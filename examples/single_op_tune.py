@@ -1,13 +1,20 @@
+import os
 import tvm
+from tvm import tir
 from tvm.script import tir as T
 import bitblas
+from bitblas.gpu.matmul_analysis import get_tensorized_func_and_tags
+
+bitblas.set_log_level(os.environ.get("BITBLAS_LOG_LEVEL", "Info"))
 
-bitblas.set_log_level("DEBUG")
 
 @tvm.script.ir_module
 class FusedSingleOp:
+
     @T.prim_func(private=True)
-    def fused_dense_relu(input0: T.Buffer((T.int64(2073600), T.int64(64)), "float16"), param_0: T.Buffer((T.int64(64), T.int64(64)), "float16"), T_relu_intermediate: T.Buffer((T.int64(2073600), T.int64(64)), "float16")):
+    def fused_dense_relu(input0: T.Buffer((T.int64(2073600), T.int64(64)), "float16"),
+                         param_0: T.Buffer((T.int64(64), T.int64(64)), "float16"),
+                         T_relu_intermediate: T.Buffer((T.int64(2073600), T.int64(64)), "float16")):
         T.func_attr({"tir.noalias": T.bool(True)})
         # with T.block("root"):
         T_matmul_NT_intermediate = T.alloc_buffer((T.int64(2073600), T.int64(64)), "float16")
@@ -18,22 +25,71 @@ class FusedSingleOp:
                 T.writes(T_matmul_NT_intermediate[v_i0, v_i1])
                 with T.init():
                     T_matmul_NT_intermediate[v_i0, v_i1] = T.float16(0)
-                T_matmul_NT_intermediate[v_i0, v_i1] = T_matmul_NT_intermediate[v_i0, v_i1] + input0[v_i0, v_k] * param_0[v_i1, v_k]
+                T_matmul_NT_intermediate[v_i0, v_i1] = T_matmul_NT_intermediate[
+                    v_i0, v_i1] + input0[v_i0, v_k] * param_0[v_i1, v_k]
         for ax0, ax1 in T.grid(T.int64(2073600), T.int64(64)):
             with T.block("T_relu"):
                 v_ax0, v_ax1 = T.axis.remap("SS", [ax0, ax1])
                 T.reads(T_matmul_NT_intermediate[v_ax0, v_ax1])
                 T.writes(T_relu_intermediate[v_ax0, v_ax1])
-                T_relu_intermediate[v_ax0, v_ax1] = T.max(T_matmul_NT_intermediate[v_ax0, v_ax1], T.float16(0))
+                T_relu_intermediate[v_ax0, v_ax1] = T.max(T_matmul_NT_intermediate[v_ax0, v_ax1],
+                                                          T.float16(0))
+
 
 ir_module = FusedSingleOp
-target = tvm.target.Target("cuda")
-    
+# the detected tag also carries the device attrs (e.g. l2_cache_size_bytes) read by the roller
+target = tvm.target.Target(bitblas.auto_detect_nvidia_target())
+
+# fast tuning switches to TensorCorePolicy when the matmul can be tensorized
+_, tags = get_tensorized_func_and_tags(ir_module["fused_dense_relu"], target)
+assert tags, f"fused_dense_relu can not be tensorized on {target}"
+
 with target:
-    mod = bitblas.ApplyFastTuning(topk=1)(ir_module)
+    fast_tuning = bitblas.ApplyFastTuning(
+        topk=20,
+        patience=2,
+        meta_database_dir=os.path.join(bitblas.cache.get_database_path(), "single_op_tune"),
+    )
+    mod = fast_tuning(ir_module)
+
+
+def global_intermediates(func: tir.PrimFunc):
+    buffers = []
+
+    def visit(node):
+        if isinstance(node, tir.Block):
+            buffers.extend(buf.name for buf in node.alloc_buffers if buf.scope() == "global")
+
+    tir.stmt_functor.post_order_visit(func.body, visit)
+    return buffers
+
+
+# the matmul schedule inlines T_relu into its register write-back, so the
+# 2073600x64 T_matmul_NT_intermediate is never materialized in global memory.
+# the tuned kernel allocates nothing else, relax.build plans the graph level
+# buffers (StaticPlanBlockMemory) in its default pipeline.
+assert not global_intermediates(mod["fused_dense_relu"]), "relu epilogue is not fused"
+
+
+def vectorized_extents(func: tir.PrimFunc):
+    extents = []
+
+    def visit(node):
+        if isinstance(node, tir.For) and node.kind == tir.ForKind.VECTORIZED:
+            extents.append(int(node.extent))
+
+    tir.stmt_functor.post_order_visit(func.body, visit)
+    return extents
+
+
+# no hand written pre-schedule is applied, ApplyFastTuning replaces it anyway.
+# the tuned kernel already blocks M across thread blocks and loads input0 with
+# 128-bit (8 x fp16) vectorized accesses, which is what such a schedule would add.
+assert 8 in vectorized_extents(mod["fused_dense_relu"]), "input0 loads are not 128-bit"
 
 print(mod)
 from tvm import relax
-exec = relax.build(mod, target="cuda")
+# build for the same target that the module was tuned with
+exec = relax.build(mod, target=target)
 dev = tvm.device("cuda", 0)
 vm = relax.VirtualMachine(exec, dev)
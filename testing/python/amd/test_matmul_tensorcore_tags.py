@@ -0,0 +1,15 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import bitblas
+import bitblas.testing
+from bitblas.base.arch import is_tensorcore_supported_precision
+
+
+def test_cdna_tensorcore_supported_precision():
+    arch = bitblas.testing.StubCDNA()
+    assert is_tensorcore_supported_precision("float16", "float32", arch)
+    assert not is_tensorcore_supported_precision("int8", "int32", arch)
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
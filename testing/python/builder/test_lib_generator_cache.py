@@ -0,0 +1,46 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import os
+import uuid
+import bitblas
+import bitblas.testing
+from bitblas.builder.lib_generator import LibraryGenerator, BITBLAS_LIB_CACHE_PATH
+
+
+def compile_lib(code):
+    generator = LibraryGenerator(bitblas.testing.StubCUDA())
+    generator.update_lib_code(code)
+    generator.compile_lib()
+    return generator
+
+
+def assert_lib_cache_hit():
+    # a fresh symbol name keeps the first compilation out of the existing cache
+    code = f"extern \"C\" int init_{uuid.uuid4().hex}() {{ return 0; }}"
+    first = compile_lib(code)
+    mtime = os.path.getmtime(first.get_lib_path())
+    second = compile_lib(code)
+    assert first.get_lib_path() == second.get_lib_path()
+    assert os.path.dirname(second.get_lib_path()) == os.path.normpath(BITBLAS_LIB_CACHE_PATH)
+    assert os.path.getmtime(second.get_lib_path()) >= mtime
+    with open(second.get_source_path()) as f:
+        assert f.read() == code
+    # the cached lib is shared, removing it only drops the reference
+    first.remove_lib()
+    assert os.path.exists(second.get_lib_path())
+
+
+def assert_lib_cache_miss():
+    code = f"extern \"C\" int init_{uuid.uuid4().hex}() {{ return 0; }}"
+    first = compile_lib(code)
+    second = compile_lib(code.replace("return 0", "return 1"))
+    assert first.get_lib_path() != second.get_lib_path()
+
+
+def test_lib_cache():
+    assert_lib_cache_hit()
+    assert_lib_cache_miss()
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
@@ -0,0 +1,62 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import bitblas
+import bitblas.testing
+from bitblas import tvm  # noqa: F401
+from tvm.script import tir as T
+from bitblas.base.roller.hint import TileDict
+from bitblas.base.roller.policy import DefaultPolicy
+
+
+def elementwise_add(M, N, dtype):
+
+    @T.prim_func
+    def main(A: T.Buffer((M, N), dtype), B: T.Buffer((M, N), dtype), C: T.Buffer((M, N), dtype)):
+        T.func_attr({"global_symbol": "main", "tir.noalias": True})
+        for i, j in T.grid(M, N):
+            with T.block("C"):
+                vi, vj = T.axis.remap("SS", [i, j])
+                C[vi, vj] = A[vi, vj] + B[vi, vj]
+
+    return main
+
+
+def assert_elementwise_vectorized_step(M, N, dtype, expected_vec):
+    arch = bitblas.testing.StubCUDA()
+    configs = DefaultPolicy(elementwise_add(M, N, dtype), arch).emit_config(topk=10)
+    assert len(configs) > 0
+    for config in configs:
+        assert config.vectorize, f"{config} plans no vectorized access"
+        per_thread = config.block[-1] // config.thread[-1]
+        assert per_thread % config._step[-1] == 0
+    # the innermost step is widened to 128-bit accesses per thread
+    assert any(config._step[-1] == expected_vec for config in configs)
+
+
+def test_elementwise_vectorized_step():
+    assert_elementwise_vectorized_step(1024, 1024, "float16", 8)
+    assert_elementwise_vectorized_step(1024, 1024, "float32", 4)
+
+
+def tile_dict(grid_size, traffic, num_wave=1):
+    td = TileDict([1, 1])
+    td.grid_size = grid_size
+    td.traffic = traffic
+    td.num_wave = num_wave
+    return td
+
+
+def test_underfilled_grid_ranks_lower():
+    arch = bitblas.testing.StubCUDA()
+    policy = DefaultPolicy(elementwise_add(1024, 1024, "float16"), arch)
+    filled = tile_dict(arch.compute_max_core, traffic=32768)
+    # half of the SMs stay idle, the slightly lower traffic does not make up for it
+    underfilled = tile_dict(arch.compute_max_core // 2, traffic=30720)
+    assert policy._tile_priority(filled) < policy._tile_priority(underfilled)
+    # beyond one block per SM the grid size alone does not change the priority
+    oversubscribed = tile_dict(4 * arch.compute_max_core, traffic=32768)
+    assert policy._tile_priority(filled) == policy._tile_priority(oversubscribed)
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
@@ -0,0 +1,81 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import bitblas
+import bitblas.testing
+from bitblas.base.tuner import apply_and_build_with_patience
+
+
+class FakeCompileResult:
+
+    def __init__(self, latency):
+        self.latency = latency
+
+
+class FakeApplyAndBuild:
+    """Configs are the latencies of the candidates, None for a config that fails to build."""
+
+    def __init__(self):
+        self.batches = []
+        self.baseline_latencies = []
+
+    def __call__(self, func, configs, arch, baseline_latency=None, **kwargs):
+        self.batches.append(list(configs))
+        self.baseline_latencies.append(baseline_latency)
+        cpresults = [FakeCompileResult(latency) for latency in configs if latency is not None]
+        best = min(cpresults, key=lambda cpresult: cpresult.latency, default=None)
+        return cpresults, best
+
+
+def tune_with_patience(configs, patience, batch_size):
+    apply_and_build = FakeApplyAndBuild()
+    cpresults, best = apply_and_build_with_patience(
+        None,
+        configs,
+        None,
+        patience=patience,
+        batch_size=batch_size,
+        apply_and_build=apply_and_build)
+    return apply_and_build, cpresults, best
+
+
+def test_stop_after_patience():
+    apply_and_build, cpresults, best = tune_with_patience([3.0, 2.0, 4.0, 5.0, 6.0, 7.0, 1.0],
+                                                          patience=2,
+                                                          batch_size=2)
+    assert apply_and_build.batches == [[3.0, 2.0], [4.0, 5.0], [6.0, 7.0]]
+    assert len(cpresults) == 6
+    assert best.latency == 2.0
+
+
+def test_improvement_resets_patience():
+    apply_and_build, _, best = tune_with_patience([3.0, 4.0, 2.0, 5.0, 6.0],
+                                                  patience=2,
+                                                  batch_size=1)
+    assert len(apply_and_build.batches) == 5
+    assert best.latency == 2.0
+
+
+def test_failed_batches_are_not_stale():
+    apply_and_build, _, best = tune_with_patience([None, None, None, None, None, None, 5.0, 4.0],
+                                                  patience=2,
+                                                  batch_size=2)
+    assert len(apply_and_build.batches) == 4
+    assert best.latency == 4.0
+
+
+def test_all_configs_fail():
+    apply_and_build, cpresults, best = tune_with_patience([None, None, None],
+                                                          patience=1,
+                                                          batch_size=1)
+    assert len(apply_and_build.batches) == 3
+    assert cpresults == []
+    assert best is None
+
+
+def test_batches_abort_against_global_best():
+    apply_and_build, _, _ = tune_with_patience([3.0, None, 2.0, 4.0, 5.0], patience=3, batch_size=1)
+    assert apply_and_build.baseline_latencies == [None, 3.0, 3.0, 2.0, 2.0]
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()
@@ -0,0 +1,30 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+import os
+import bitblas
+import bitblas.testing
+from bitblas.common import get_build_workers
+
+
+def assert_build_workers(env, expected, default=10):
+    origin = os.environ.pop("BITBLAS_BUILD_WORKERS", None)
+    try:
+        if env is not None:
+            os.environ["BITBLAS_BUILD_WORKERS"] = env
+        assert get_build_workers(default=default) == expected
+    finally:
+        os.environ.pop("BITBLAS_BUILD_WORKERS", None)
+        if origin is not None:
+            os.environ["BITBLAS_BUILD_WORKERS"] = origin
+
+
+def test_build_workers():
+    assert_build_workers(None, 10)
+    assert_build_workers(None, 4, default=4)
+    assert_build_workers("32", 32)
+    assert_build_workers("32", 32, default=4)
+    assert_build_workers("0", 1)
+
+
+if __name__ == "__main__":
+    bitblas.testing.main()